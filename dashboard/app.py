@@ -1,19 +1,40 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
+import os
 from pathlib import Path
 
 DATA_DIR = Path(__file__).parent.parent / "output_data"
+ATTENDANCE_CSV = DATA_DIR / "session_attendance.csv"
+TYPES_CSV = DATA_DIR / "session_types.csv"
+# Merged + derived frame, rebuilt whenever a source CSV (or this file) is newer
+CACHE_PATH = DATA_DIR / ".cache.parquet"
 
 st.set_page_config(page_title="Bath Amphibians Attendance", layout="wide")
 st.title("Bath Amphibians Attendance Dashboard")
 
 
+def _cache_is_fresh() -> bool:
+    if not CACHE_PATH.exists():
+        return False
+    cache_mtime = CACHE_PATH.stat().st_mtime
+    sources = (ATTENDANCE_CSV, TYPES_CSV, Path(__file__))
+    return all(p.stat().st_mtime <= cache_mtime for p in sources)
+
+
 @st.cache_data
 def load_data() -> pd.DataFrame:
-    attendance = pd.read_csv(DATA_DIR / "session_attendance.csv", sep="|")
-    types = pd.read_csv(DATA_DIR / "session_types.csv")
+    if _cache_is_fresh():
+        # An unreadable cache (e.g. from an interrupted run) is rebuilt
+        try:
+            return pd.read_parquet(CACHE_PATH, engine="pyarrow")
+        except (OSError, ValueError):
+            pass
+
+    attendance = pd.read_csv(ATTENDANCE_CSV, sep="|")
+    types = pd.read_csv(TYPES_CSV)
 
     df = attendance.merge(types, on="session_name", how="left")
     df["category"] = df["category"].fillna("Other")
@@ -23,15 +44,90 @@ def load_data() -> pd.DataFrame:
     df["month"] = df["session_date"].dt.month
     df["month_name"] = df["session_date"].dt.strftime("%b")
     df["year_month"] = df["session_date"].dt.to_period("M").astype(str)
+    df["label"] = (
+        df["session_name"].astype(str)
+        + " ("
+        + df["session_day_of_week"].astype(str)
+        + ")"
+    ).astype("category")
+
+    # Low-cardinality string columns: group/filter on integer codes
+    for col in ("category", "session_name", "session_day_of_week", "year_month"):
+        df[col] = df[col].astype("category")
+    month_abbrs = [pd.Timestamp(2000, m, 1).strftime("%b") for m in range(1, 13)]
+    df["month_name"] = pd.Categorical(
+        df["month_name"], categories=month_abbrs, ordered=True
+    )
+
+    # Written to a temporary sibling and moved into place, so an interrupted
+    # write never leaves a partial cache under CACHE_PATH
+    tmp_path = CACHE_PATH.with_name(f"{CACHE_PATH.name}.tmp")
+    try:
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass  # Read-only data dir: fall back to rebuilding on each cold start
     return df
 
 
+@st.cache_data
+def year_palette(years: tuple[str, ...]) -> dict[str, str]:
+    """Light-to-dark blue per year so recent years stand out."""
+    if len(years) == 1:
+        return {years[0]: "rgb(8,81,156)"}
+    start = np.array([200, 210, 235])
+    span = np.array([180, 130, 79])
+    steps = np.arange(len(years))[:, None]
+    rgb = start - span * steps // (len(years) - 1)
+    return {yr: f"rgb({r}, {g}, {b})" for yr, (r, g, b) in zip(years, rgb.tolist())}
+
+
+def category_mask(col: pd.Series, wanted: list[str]) -> np.ndarray:
+    """Rows of a categorical column whose value is in wanted, tested on codes."""
+    wanted_codes = col.cat.categories.get_indexer(wanted)
+    return np.isin(col.cat.codes.to_numpy(), wanted_codes[wanted_codes >= 0])
+
+
+def lttb(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of a Largest-Triangle-Three-Buckets subsample of evenly spaced y."""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float)
+    y = y.astype(float)
+    # First and last points are always kept; the rest split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_traces(frame: pd.DataFrame, by: str, y: str) -> pd.DataFrame:
+    """Cap each trace (rows sharing `by`) at MAX_POINTS_PER_TRACE via LTTB."""
+    if len(frame) <= MAX_POINTS_PER_TRACE or (
+        frame[by].value_counts().max() <= MAX_POINTS_PER_TRACE
+    ):
+        return frame
+    return pd.concat(
+        trace.iloc[lttb(trace[y].to_numpy(), MAX_POINTS_PER_TRACE)]
+        for _, trace in frame.groupby(by, observed=True, sort=False)
+    )
+
+
 df = load_data()
 
 # ── Sidebar filters ──────────────────────────────────────────────────────────
 st.sidebar.header("Filters")
 
-all_categories = sorted(df["category"].unique())
+all_categories = list(df["category"].cat.categories)
 selected_categories = st.sidebar.multiselect(
     "Session type",
     all_categories,
@@ -49,18 +145,42 @@ date_range = st.sidebar.date_input(
 
 month_labels = {m: pd.Timestamp(2000, m, 1).strftime("%B") for m in range(1, 13)}
 
+# Categories that get per-session charts in the Monthly and YoY tabs
+CHART_CATEGORIES = ["Swim", "Bike", "Run", "S&C"]
+YOY_FACET_COLS = 2
+# Monthly series grow with club history; longer traces are LTTB-downsampled
+MAX_POINTS_PER_TRACE = 200
+
 # ── Apply filters ─────────────────────────────────────────────────────────────
-filtered = df[df["category"].isin(selected_categories)]
-if len(date_range) == 2:
-    filtered = filtered[
-        (filtered["session_date"].dt.date >= date_range[0])  # ty: ignore[index-out-of-bounds]
-        & (filtered["session_date"].dt.date <= date_range[1])  # ty: ignore[index-out-of-bounds]
-    ]
+# Build one mask and gather once; the default full range needs no date test
+date_bounds = (date_min, date_max)
+# Unpacked structurally: a half-picked range is a 1-tuple until both ends are set
+match date_range:
+    case (start, end):
+        date_bounds = (start, end)
+mask = category_mask(df["category"], selected_categories)
+if date_bounds != (date_min, date_max):
+    # Half-open [start, end + 1 day) keeps the comparison on datetime64 values
+    start, end = date_bounds
+    lo = pd.Timestamp(start)
+    hi = pd.Timestamp(end) + pd.Timedelta(days=1)
+    mask &= ((df["session_date"] >= lo) & (df["session_date"] < hi)).to_numpy()
+filtered = df[mask]
+
+# Signature of the sidebar filter. The tab aggregates below are cached on it;
+# their frame arguments are underscore-prefixed so Streamlit skips hashing them.
+filter_key = (tuple(selected_categories), *date_bounds)
 
 if filtered.empty:
     st.warning("No data matches the selected filters.")
     st.stop()
 
+# Narrow rows and columns once for the chart tabs, before any groupby
+chart_src = filtered.loc[
+    category_mask(filtered["category"], CHART_CATEGORIES),
+    ["label", "category", "attended", "year", "month", "year_month"],
+]
+
 # ── KPI row ───────────────────────────────────────────────────────────────────
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("Total sessions", f"{len(filtered):,}")
@@ -76,29 +196,39 @@ tab_monthly, tab_yoy, tab_yoy_summary, tab_detail, tab_data = st.tabs(
     ["Monthly Trends", "Year over Year", "YoY Summary", "Session Detail", "Raw Data"]
 )
 
+
 # ── Monthly Trends ────────────────────────────────────────────────────────────
-with tab_monthly:
-    monthly_session_dow = (
-        filtered.groupby(
-            ["year_month", "session_name", "session_day_of_week", "category"]
+@st.cache_data(max_entries=32)
+def monthly_agg(_chart_src: pd.DataFrame, filter_key: tuple) -> pd.DataFrame:
+    """Mean attendance per (month, session), for one sidebar filter."""
+    return (
+        _chart_src.groupby(
+            ["year_month", "label", "category"],
+            observed=True,
+            sort=False,
         )["attended"]
         .mean()
         .reset_index()
         .rename(columns={"attended": "avg_attended"})
         .sort_values("year_month")
     )
-    monthly_session_dow["label"] = (
-        monthly_session_dow["session_name"]
-        + " ("
-        + monthly_session_dow["session_day_of_week"]
-        + ")"
+
+
+@st.fragment
+def render_monthly(chart_src: pd.DataFrame, filter_key: tuple) -> None:
+    """Monthly average attendance per session, one facet row per category."""
+    monthly_session_dow = monthly_agg(chart_src, filter_key)
+
+    monthly_by_cat = dict(
+        list(monthly_session_dow.groupby("category", observed=True, sort=False))
     )
 
-    for cat in ["Swim", "Bike", "Run", "S&C"]:
-        cat_data = monthly_session_dow[monthly_session_dow["category"] == cat]
-        if cat_data.empty:
+    st.subheader("Avg attendance by month")
+    facets = []
+    for cat in CHART_CATEGORIES:
+        cat_data = monthly_by_cat.get(cat)
+        if cat_data is None:
             continue
-        st.subheader(f"{cat} – avg attendance by month")
         available = sorted(cat_data["label"].unique())
         selected = st.multiselect(
             f"Filter {cat} sessions (leave empty for all)",
@@ -107,87 +237,135 @@ with tab_monthly:
         )
         if selected:
             cat_data = cat_data[cat_data["label"].isin(selected)]
-        fig = px.line(
-            cat_data,
-            x="year_month",
-            y="avg_attended",
-            color="label",
-            markers=True,
-            labels={
-                "year_month": "Month",
-                "avg_attended": "Avg attendance",
-                "label": "Session (Day)",
-            },
-        )
-        fig.update_layout(xaxis_tickangle=-45, height=500, yaxis_rangemode="tozero")
-        st.plotly_chart(fig, use_container_width=True)
+        facets.append((cat, cat_data))
+    if not facets:
+        return
+
+    # One figure with a row per category: a single Plotly payload and a
+    # shared month axis instead of four separate charts.
+    plot_data = downsample_traces(
+        pd.concat([cat_data for _, cat_data in facets]), "label", "avg_attended"
+    )
+    fig = px.line(
+        plot_data,
+        x="year_month",
+        y="avg_attended",
+        color="label",
+        facet_row="category",
+        markers=True,
+        render_mode="webgl",
+        labels={
+            "year_month": "Month",
+            "avg_attended": "Avg attendance",
+            "label": "Session (Day)",
+        },
+        category_orders={
+            "category": [cat for cat, _ in facets],
+            "year_month": sorted(plot_data["year_month"].unique()),
+        },
+    )
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    fig.update_yaxes(matches=None, rangemode="tozero")
+    fig.update_xaxes(tickangle=-45)
+    fig.update_traces(line_shape="linear")
+    fig.update_layout(height=400 * len(facets), uirevision="keep")
+    st.plotly_chart(fig, use_container_width=True)
+
+
+with tab_monthly:
+    render_monthly(chart_src, filter_key)
+
 
 # ── Year-over-Year ────────────────────────────────────────────────────────────
-with tab_yoy:
+@st.cache_data(max_entries=32)
+def yoy_agg(_chart_src: pd.DataFrame, filter_key: tuple) -> pd.DataFrame:
+    """Mean attendance per (year, month, session), for one sidebar filter."""
     yoy = (
-        filtered.groupby(
-            ["year", "month", "session_name", "session_day_of_week", "category"]
+        _chart_src.groupby(
+            ["year", "month", "label", "category"],
+            observed=True,
+            sort=False,
         )["attended"]
         .mean()
         .reset_index()
         .rename(columns={"attended": "avg_attended"})
     )
     yoy["month_name"] = yoy["month"].map(month_labels)
-    yoy["label"] = yoy["session_name"] + " (" + yoy["session_day_of_week"] + ")"
     yoy["year"] = yoy["year"].astype(str)
-    yoy = yoy.sort_values(["year", "month"])
+    return yoy.sort_values(["year", "month"])
 
-    # Build a light-to-dark blue palette so recent years stand out
+
+@st.fragment
+def render_yoy(chart_src: pd.DataFrame, filter_key: tuple) -> None:
+    """Per-session month-by-month lines, one colour per year."""
+    yoy = yoy_agg(chart_src, filter_key)
     all_years_yoy = sorted(yoy["year"].unique())
-    n_years = len(all_years_yoy)
-    if n_years == 1:
-        year_colors = {all_years_yoy[0]: "rgb(8,81,156)"}
-    else:
-        year_colors = {
-            yr: f"rgb({200 - int(180 * i / (n_years - 1))}, "
-            f"{210 - int(130 * i / (n_years - 1))}, "
-            f"{235 - int(79 * i / (n_years - 1))})"
-            for i, yr in enumerate(all_years_yoy)
+    year_colors = year_palette(tuple(all_years_yoy))
+
+    # One pass over yoy: category -> session label -> ready-to-plot rows
+    yoy_by_cat: dict[str, dict[str, pd.DataFrame]] = {
+        str(cat): {
+            str(label): label_rows
+            for label, label_rows in cat_rows.groupby(
+                "label", observed=True, sort=False
+            )
         }
+        for cat, cat_rows in yoy.groupby("category", observed=True, sort=False)
+    }
 
-    for cat in ["Swim", "Bike", "Run", "S&C"]:
-        cat_data = yoy[yoy["category"] == cat]
-        if cat_data.empty:
+    for cat in CHART_CATEGORIES:
+        by_label = yoy_by_cat.get(cat)
+        if not by_label:
             continue
         st.subheader(f"{cat} – year over year")
-        available_yoy = sorted(cat_data["label"].unique())
+        available_yoy = sorted(by_label)
         selected_yoy = st.multiselect(
             f"Filter {cat} sessions (leave empty for all)",
             available_yoy,
             key=f"yoy_{cat}",
         )
-        if selected_yoy:
-            cat_data = cat_data[cat_data["label"].isin(selected_yoy)]
-        for session_label in sorted(cat_data["label"].unique()):
-            subset = cat_data[cat_data["label"] == session_label]
-            fig = px.line(
-                subset,
-                x="month_name",
-                y="avg_attended",
-                color="year",
-                markers=True,
-                title=session_label,
-                labels={
-                    "month_name": "Month",
-                    "avg_attended": "Avg attendance",
-                    "year": "Year",
-                },
-                category_orders={
-                    "month_name": list(month_labels.values()),
-                    "year": all_years_yoy,
-                },
-                color_discrete_map=year_colors,
-            )
-            fig.update_layout(height=400, yaxis_rangemode="tozero")
-            st.plotly_chart(fig, use_container_width=True)
+        session_labels = sorted(selected_yoy or available_yoy)
+        rows = -(-len(session_labels) // YOY_FACET_COLS)
+        # One faceted figure per category, a panel per session
+        fig = px.line(
+            pd.concat([by_label[session_label] for session_label in session_labels]),
+            x="month_name",
+            y="avg_attended",
+            color="year",
+            facet_col="label",
+            facet_col_wrap=YOY_FACET_COLS,
+            # Plotly rejects a spacing above 1 / (rows - 1)
+            facet_row_spacing=min(0.08, 0.9 / max(rows - 1, 1)),
+            markers=True,
+            render_mode="webgl",
+            labels={
+                "month_name": "Month",
+                "avg_attended": "Avg attendance",
+                "year": "Year",
+            },
+            category_orders={
+                "month_name": list(month_labels.values()),
+                "year": all_years_yoy,
+                "label": session_labels,
+            },
+            color_discrete_map=year_colors,
+        )
+        fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+        fig.update_yaxes(matches=None, rangemode="tozero", showticklabels=True)
+        fig.update_xaxes(showticklabels=True)
+        fig.update_traces(line_shape="linear")
+        fig.update_layout(height=350 * rows, uirevision="keep")
+        st.plotly_chart(fig, use_container_width=True)
+
+
+with tab_yoy:
+    render_yoy(chart_src, filter_key)
+
 
 # ── YoY Summary (pivot table) ────────────────────────────────────────────────
-with tab_yoy_summary:
+@st.fragment
+def render_yoy_summary(df: pd.DataFrame) -> None:
+    """Pivot of recent monthly averages vs the same month a year earlier."""
     st.subheader("Year-over-Year Summary")
 
     # Work from unfiltered data so sidebar filters don't affect this tab
@@ -219,7 +397,7 @@ with tab_yoy_summary:
 
     if not selected_sessions:
         st.info("Select at least one session above.")
-        st.stop()
+        return
 
     # Rolling window: last N months back from the latest data point
     num_months = st.slider("Months to show", 3, 12, 6, key="yoy_summary_months")
@@ -249,21 +427,26 @@ with tab_yoy_summary:
 
     # Compute monthly averages per session / day-of-week / year / month
     summary = (
-        src.groupby(["year", "month", "session_name", "session_day_of_week"])[
-            "attended"
-        ]
+        src.groupby(
+            ["year", "month", "session_name", "session_day_of_week"],
+            observed=True,
+            sort=False,
+        )["attended"]
         .mean()
         .reset_index()
         .rename(columns={"attended": "avg"})
     )
     summary["avg"] = summary["avg"].round(1)
     summary["label"] = (
-        summary["session_name"] + " (" + summary["session_day_of_week"].str[:3] + ")"
+        summary["session_name"].astype(str)
+        + " ("
+        + summary["session_day_of_week"].astype(str).str[:3]
+        + ")"
     )
 
     if summary.empty:
         st.info("No data for the selected sessions and time range.")
-        st.stop()
+        return
 
     # Map each label back to its category for ordering
     label_cat = (
@@ -283,7 +466,7 @@ with tab_yoy_summary:
     )
     if not active_labels:
         st.info("No sessions found with data in the current period.")
-        st.stop()
+        return
     summary = summary[summary["label"].isin(active_labels)]
 
     # Column headers: "Mon YYYY" for each month in the window
@@ -433,33 +616,47 @@ with tab_yoy_summary:
             html_table, height=40 + 30 * len(row_labels), scrolling=True
         )
 
-# ── Session Detail ────────────────────────────────────────────────────────────
-with tab_detail:
-    st.subheader("Session-level detail")
 
+with tab_yoy_summary:
+    render_yoy_summary(df)
+
+
+# ── Session Detail ────────────────────────────────────────────────────────────
+@st.cache_data(max_entries=32)
+def detail_agg(_filtered: pd.DataFrame, filter_key: tuple) -> pd.DataFrame:
+    """Per-session attendance statistics, for one sidebar filter."""
     detail = (
-        filtered.groupby(["session_name", "category", "session_day_of_week"])[
-            "attended"
-        ]
-        .agg(["mean", "sum", "count", "max", "min"])
-        .reset_index()
-        .rename(
-            columns={
-                "mean": "avg_attended",
-                "sum": "total_attended",
-                "count": "num_sessions",
-                "max": "max_attended",
-                "min": "min_attended",
-            }
+        _filtered.groupby(
+            ["session_name", "category", "session_day_of_week"],
+            observed=True,
+            sort=False,
+        )["attended"]
+        .agg(
+            avg_attended="mean",
+            total_attended="sum",
+            num_sessions="count",
+            max_attended="max",
+            min_attended="min",
         )
-        .sort_values("total_attended", ascending=False)
+        .reset_index()
+        .sort_values(["total_attended", "session_name"], ascending=[False, True])
     )
     detail["avg_attended"] = detail["avg_attended"].round(1)
+    return detail
 
-    st.dataframe(detail, use_container_width=True, hide_index=True)
+
+with tab_detail:
+    st.subheader("Session-level detail")
+    st.dataframe(
+        detail_agg(filtered, filter_key), use_container_width=True, hide_index=True
+    )
 
 # ── Raw Data ─────────────────────────────────────────────────────────────────
 with tab_data:
     st.subheader("Raw data")
-    raw = filtered.sort_values("session_date", ascending=False).reset_index(drop=True)
+    raw = (
+        filtered.drop(columns="label")
+        .sort_values("session_date", ascending=False)
+        .reset_index(drop=True)
+    )
     st.dataframe(raw, use_container_width=True, hide_index=True, height=700)
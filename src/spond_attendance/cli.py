@@ -8,21 +8,34 @@ from pathlib import Path
 
 import pandas as pd
 
-from .io import discover_files, find_new_files, load_state, save_state
+from .io import (
+    CACHE_DIRNAME,
+    discover_files,
+    find_new_files,
+    load_state,
+    save_state,
+)
 from .mapping import (
-    SKIP_SENTINEL,
     apply_name_mappings,
+    prompt_user_approval,
+    suggest_categories,
+    suggest_mappings,
+)
+from .mapping_core import (
+    SKIP_SENTINEL,
     find_unmapped_names,
     load_canonical_names,
     load_name_mappings,
     load_session_types,
-    prompt_user_approval,
     save_name_mappings,
     save_session_types,
-    suggest_categories,
-    suggest_mappings,
 )
-from .transform import generate_outputs, merge_with_existing, process_files
+from .transform import (
+    CATEGORICAL_COLUMNS,
+    generate_outputs,
+    merge_with_existing,
+    process_files,
+)
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -45,7 +58,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument(
         "--full-refresh",
         action="store_true",
-        help="Reprocess all files, ignoring state",
+        help="Reprocess all files, ignoring state and the parse cache",
     )
     parser.add_argument(
         "--no-llm",
@@ -87,12 +100,21 @@ def main(argv: list[str] | None = None) -> None:
     for f in files_to_process:
         print(f"  {f.name}")
 
-    new_data = process_files(files_to_process)
+    new_data = process_files(
+        files_to_process,
+        cache_dir=output_dir / CACHE_DIRNAME,
+        refresh=args.full_refresh,
+    )
 
     # Merge with existing output if doing incremental processing
     existing_csv = output_dir / "spond.csv"
     if not args.full_refresh and existing_csv.exists():
-        existing = pd.read_csv(existing_csv, sep="|", parse_dates=["session_date"])
+        existing = pd.read_csv(
+            existing_csv,
+            sep="|",
+            parse_dates=["session_date"],
+            dtype=dict.fromkeys(CATEGORICAL_COLUMNS, "category"),
+        )
         existing["session_date"] = existing["session_date"].dt.date
         result = merge_with_existing(existing, new_data)
     else:
@@ -171,7 +193,7 @@ def main(argv: list[str] | None = None) -> None:
     )
     save_state(output_dir, all_processed)
 
-    sessions = result.groupby(["session_name", "session_date"]).ngroups
+    sessions = result.groupby(["session_name", "session_date"], observed=True).ngroups
     print("\nOutput written:")
     print(f"  {detail_path}  ({len(result)} rows)")
     print(f"  {summary_path}  ({sessions} sessions)")
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import importlib.util
 import json
+import multiprocessing
+import os
 import re
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 from pathlib import Path
 
@@ -32,6 +36,18 @@ FILENAME_PATTERN = re.compile(
 
 STATE_FILENAME = ".spond_state.json"
 
+# Per-export parquet cache of transformed frames, inside the output dir
+CACHE_DIRNAME = ".cache"
+
+# The Rust-based calamine reader is several times faster than openpyxl;
+# use it when python-calamine is installed.
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# A spawned worker imports pandas (~0.3 s) before it reads anything, more
+# than calamine takes to read a whole year of exports (~20 ms each); below
+# this many files calamine reads serially
+CALAMINE_POOL_MIN_FILES = 64
+
 
 def parse_file_date(path: Path) -> date:
     """Extract the month/year from a Spond attendance filename.
@@ -56,13 +72,12 @@ def discover_files(directory: Path) -> list[Path]:
     naming pattern spond_attendance_{month}_{yy}.xlsx.
     """
     unexpected = []
-    files = []
+    dated_files: list[tuple[date, Path]] = []
     for f in directory.glob("*.xlsx"):
         if f.name.startswith("~$"):
             continue
         try:
-            parse_file_date(f)
-            files.append(f)
+            dated_files.append((parse_file_date(f), f))
         except ValueError:
             unexpected.append(f.name)
     if unexpected:
@@ -70,15 +85,79 @@ def discover_files(directory: Path) -> list[Path]:
             f"Unexpected xlsx file(s) in directory: {', '.join(sorted(unexpected))}. "
             f"Expected format: spond_attendance_{{month}}_{{yy}}.xlsx"
         )
-    files.sort(key=parse_file_date)
-    return files
+    # Sort on the dates parsed during validation rather than re-parsing
+    dated_files.sort()
+    return [f for _, f in dated_files]
 
 
 def read_attendance_file(path: Path) -> pd.DataFrame:
     """Read a single Spond attendance Excel export."""
+    if EXCEL_ENGINE == "calamine":
+        return pd.read_excel(path, engine="calamine")
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", message="Workbook contains no default style")
-        return pd.read_excel(path, engine="openpyxl")
+        return _read_openpyxl(path)
+
+
+def read_many(paths: list[Path]) -> list[pd.DataFrame]:
+    """Read several attendance files, returned in the same order as paths.
+
+    Excel parsing under openpyxl is CPU-bound pure Python, so multiple
+    files are read in a process pool. Calamine reads fast enough that the
+    pool's start-up cost only pays off for many files. A single file (or a
+    single core) is read in-process.
+    """
+    workers = min(len(paths), os.cpu_count() or 1)
+    if EXCEL_ENGINE == "calamine" and len(paths) < CALAMINE_POOL_MIN_FILES:
+        workers = 1
+    if workers <= 1:
+        return [read_attendance_file(p) for p in paths]
+    # spawn, not fork: the parent may already have pyarrow threads running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        return list(executor.map(read_attendance_file, paths))
+
+
+def _read_openpyxl(path: Path) -> pd.DataFrame:
+    """Read the first sheet with openpyxl's read-only row iterator.
+
+    Builds the frame in one constructor call instead of going through
+    read_excel's cell conversion and text parser (about 30% faster). Header
+    names follow read_excel: blank headers become "Unnamed: <i>" and repeats
+    get ".1", ".2", ... suffixes.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = list(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+    # Formatting can extend the sheet's dimensions past the data
+    while rows and all(value is None for value in rows[-1]):
+        rows.pop()
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows[1:], columns=_header_names(rows[0]))
+
+
+def _header_names(header: tuple) -> pd.Index:
+    """Column labels as read_excel assigns them (its python parser rules)."""
+    names = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+    unnamed = [i for i, name in enumerate(header) if name is None]
+    # Given names are deduplicated before the generated "Unnamed" ones
+    named = [i for i, name in enumerate(header) if name is not None]
+    counts: dict[object, int] = {}
+    for i in named + unnamed:
+        name = base = names[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return pd.Index(names)
 
 
 def load_state(output_dir: Path) -> set[str]:
@@ -86,7 +165,7 @@ def load_state(output_dir: Path) -> set[str]:
     state_path = output_dir / STATE_FILENAME
     if not state_path.exists():
         return set()
-    data = json.loads(state_path.read_text())
+    data = json.loads(state_path.read_bytes())
     return set(data.get("processed_files", []))
 
 
@@ -94,7 +173,7 @@ def save_state(output_dir: Path, processed_files: set[str]) -> None:
     """Save the set of processed filenames to state file."""
     state_path = output_dir / STATE_FILENAME
     data = {"processed_files": sorted(processed_files)}
-    state_path.write_text(json.dumps(data, indent=2) + "\n")
+    state_path.write_text(json.dumps(data, separators=(",", ":")) + "\n")
 
 
 def find_new_files(all_files: list[Path], processed: set[str]) -> list[Path]:
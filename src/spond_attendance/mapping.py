@@ -1,64 +1,42 @@
-"""Session name mapping: raw names → canonical parsed names."""
+"""Session name mapping: raw names → canonical parsed names.
+
+The CSV and JSON helpers live in mapping_core (standard library only) and
+are re-exported here. pandas and numpy are imported lazily, only on the
+categorical path of apply_name_mappings.
+"""
 
 from __future__ import annotations
 
-import csv
 import json
-import re
-from pathlib import Path
-
-import pandas as pd
-
-SKIP_SENTINEL = "__SKIP__"
-
-
-def load_name_mappings(path: Path) -> dict[str, str]:
-    """Load session_name_mappings.csv into a raw→parsed dict.
-
-    Returns an empty dict if the file doesn't exist.
-    """
-    if not path.exists():
-        return {}
-    mappings: dict[str, str] = {}
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            mappings[row["raw_session_name"]] = row["parsed_session_name"]
-    return mappings
-
-
-def save_name_mappings(path: Path, mappings: dict[str, str]) -> None:
-    """Write mappings dict back to session_name_mappings.csv."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["raw_session_name", "parsed_session_name"]
-        )
-        writer.writeheader()
-        for raw, parsed in sorted(mappings.items()):
-            writer.writerow({"raw_session_name": raw, "parsed_session_name": parsed})
-
-
-def load_canonical_names(types_path: Path) -> set[str]:
-    """Load the set of canonical session names from session_types.csv."""
-    if not types_path.exists():
-        return set()
-    df = pd.read_csv(types_path)
-    return set(df["session_name"].dropna().unique())
-
-
-def find_unmapped_names(
-    session_names: set[str],
-    mappings: dict[str, str],
-    known_canonical: set[str],
-) -> set[str]:
-    """Find session names that have no mapping and aren't already canonical.
-
-    A name is "unmapped" if it:
-    - Is not a key in the explicit mappings dict, AND
-    - Is not already a known canonical name (from session_types.csv)
-    """
-    return session_names - set(mappings.keys()) - known_canonical
+from typing import TYPE_CHECKING
+
+from .mapping_core import (
+    SKIP_SENTINEL,
+    _parse_json_response,
+    find_unmapped_names,
+    load_canonical_names,
+    load_name_mappings,
+    load_session_types,
+    save_name_mappings,
+    save_session_types,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "SKIP_SENTINEL",
+    "apply_name_mappings",
+    "find_unmapped_names",
+    "load_canonical_names",
+    "load_name_mappings",
+    "load_session_types",
+    "prompt_user_approval",
+    "save_name_mappings",
+    "save_session_types",
+    "suggest_categories",
+    "suggest_mappings",
+]
 
 
 def suggest_mappings(
@@ -103,39 +81,6 @@ Example: {{"STV Swim!": "STV Swim", "New Session Type": "New Session Type"}}"""
     return _parse_json_response(result.stdout)
 
 
-def _parse_json_response(text: str) -> dict[str, str]:
-    """Extract and parse a JSON object from Claude's response.
-
-    Handles cases where the response includes markdown fences or
-    surrounding text around the JSON.
-    """
-    text = text.strip()
-
-    # Try direct parse first
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
-    # Strip markdown code fences if present
-    fenced = re.search(r"```(?:json)?\s*\n?(.*?)\n?```", text, re.DOTALL)
-    if fenced:
-        try:
-            return json.loads(fenced.group(1).strip())
-        except json.JSONDecodeError:
-            pass
-
-    # Find the outermost { ... } block
-    brace_match = re.search(r"\{.*\}", text, re.DOTALL)
-    if brace_match:
-        try:
-            return json.loads(brace_match.group())
-        except json.JSONDecodeError:
-            pass
-
-    raise ValueError(f"Could not parse JSON from Claude response:\n{text[:500]}")
-
-
 def prompt_user_approval(
     suggestions: dict[str, str],
 ) -> tuple[dict[str, str], set[str]]:
@@ -168,28 +113,6 @@ def prompt_user_approval(
     return approved, skipped
 
 
-def load_session_types(path: Path) -> dict[str, str]:
-    """Load session_types.csv into a name→category dict."""
-    if not path.exists():
-        return {}
-    types: dict[str, str] = {}
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            types[row["session_name"]] = row["category"]
-    return types
-
-
-def save_session_types(path: Path, types: dict[str, str]) -> None:
-    """Write session types dict back to session_types.csv."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["session_name", "category"])
-        writer.writeheader()
-        for name, category in sorted(types.items()):
-            writer.writerow({"session_name": name, "category": category})
-
-
 def suggest_categories(
     uncategorized: set[str],
     existing_types: dict[str, str],
@@ -241,8 +164,22 @@ def apply_name_mappings(df: pd.DataFrame, mappings: dict[str, str]) -> pd.DataFr
     as the value are ignored (the original name is kept).
     """
     active = {k: v for k, v in mappings.items() if v != SKIP_SENTINEL}
-    if not active:
+    names = df["session_name"]
+    if not active or active.keys().isdisjoint(names.unique()):
         return df
-    df = df.copy()
-    df["session_name"] = df["session_name"].replace(active)
-    return df
+    if names.dtype == "category":
+        import numpy as np
+        import pandas as pd
+
+        # Map the few categories, then remap the integer codes: merged names
+        # share a category and no per-row strings are built. The trailing -1
+        # keeps missing values (code -1) missing.
+        renamed = [active.get(name, name) for name in names.cat.categories]
+        new_codes, categories = pd.factorize(pd.Index(renamed), sort=True)
+        lookup = np.append(new_codes, -1)
+        mapped = pd.Categorical.from_codes(
+            lookup[names.cat.codes.to_numpy()], categories=categories
+        )
+        return df.assign(session_name=pd.Series(mapped, index=names.index))
+    # Hash lookup per row; unmapped names come back NaN and are restored
+    return df.assign(session_name=names.map(active).fillna(names))
@@ -0,0 +1,116 @@
+"""Session name mapping files and helpers that need only the standard library.
+
+Kept free of pandas so mapping state can be read and written without paying
+for the pandas import; the Claude CLI and DataFrame code live in mapping.py.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import re
+from pathlib import Path
+
+SKIP_SENTINEL = "__SKIP__"
+
+
+def load_name_mappings(path: Path) -> dict[str, str]:
+    """Load session_name_mappings.csv into a raw→parsed dict.
+
+    Returns an empty dict if the file doesn't exist.
+    """
+    if not path.exists():
+        return {}
+    mappings: dict[str, str] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            mappings[row["raw_session_name"]] = row["parsed_session_name"]
+    return mappings
+
+
+def save_name_mappings(path: Path, mappings: dict[str, str]) -> None:
+    """Write mappings dict back to session_name_mappings.csv."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["raw_session_name", "parsed_session_name"])
+        writer.writerows(sorted(mappings.items()))
+
+
+def load_canonical_names(types_path: Path) -> set[str]:
+    """Load the set of canonical session names from session_types.csv."""
+    if not types_path.exists():
+        return set()
+    with open(types_path, newline="", encoding="utf-8") as f:
+        return {row["session_name"] for row in csv.DictReader(f) if row["session_name"]}
+
+
+def find_unmapped_names(
+    session_names: set[str],
+    mappings: dict[str, str],
+    known_canonical: set[str],
+) -> set[str]:
+    """Find session names that have no mapping and aren't already canonical.
+
+    A name is "unmapped" if it:
+    - Is not a key in the explicit mappings dict, AND
+    - Is not already a known canonical name (from session_types.csv)
+    """
+    # A single copy of session_names; mapping keys are discarded straight
+    # from the dict, with no intermediate set of keys
+    return session_names.difference(mappings, known_canonical)
+
+
+def load_session_types(path: Path) -> dict[str, str]:
+    """Load session_types.csv into a name→category dict."""
+    if not path.exists():
+        return {}
+    types: dict[str, str] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            types[row["session_name"]] = row["category"]
+    return types
+
+
+def save_session_types(path: Path, types: dict[str, str]) -> None:
+    """Write session types dict back to session_types.csv."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["session_name", "category"])
+        writer.writerows(sorted(types.items()))
+
+
+def _parse_json_response(text: str) -> dict[str, str]:
+    """Extract and parse a JSON object from Claude's response.
+
+    Handles cases where the response includes markdown fences or
+    surrounding text around the JSON.
+    """
+    text = text.strip()
+
+    # Try direct parse first
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Strip markdown code fences if present
+    fenced = re.search(r"```(?:json)?\s*\n?(.*?)\n?```", text, re.DOTALL)
+    if fenced:
+        try:
+            return json.loads(fenced.group(1).strip())
+        except json.JSONDecodeError:
+            pass
+
+    # Find the outermost { ... } block
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        try:
+            return json.loads(text[start : end + 1])
+        except json.JSONDecodeError:
+            pass
+
+    raise ValueError(f"Could not parse JSON from Claude response:\n{text[:500]}")
@@ -2,25 +2,55 @@
 
 from __future__ import annotations
 
+import json
+import os
 import re
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+# One output row per member per session
+DEDUP_KEY = ["name", "session_name", "session_date"]
 
+# Low-cardinality string columns, held as categoricals once combined
+CATEGORICAL_COLUMNS = ["name", "session_name", "session_day_of_week"]
+
+# Indexed by date.weekday(); fixed English names, as strftime("%A") would
+# follow the process locale
+DAY_NAMES = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+
+# Parquet metadata key naming the export a cache entry was built from
+_CACHE_SOURCE_KEY = b"spond_attendance.source"
+
+# pandas suffix on duplicate column headers, e.g. "2025-04-09 18:45:00.1"
+_DUP_SUFFIX = re.compile(r"\.\d+$")
+
+
+@lru_cache(maxsize=4096)
 def _parse_session_column(col) -> datetime | None:
     """Try to interpret a column header as a session datetime.
 
     Handles both raw datetime objects and strings with pandas
-    duplicate-column suffixes like "2025-04-09 18:45:00.1".
+    duplicate-column suffixes like "2025-04-09 18:45:00.1". Cached, as
+    the same headers recur across monthly exports.
     """
     if isinstance(col, datetime):
         return col
     if isinstance(col, pd.Timestamp):
         return col.to_pydatetime()
     if isinstance(col, str):
-        cleaned = re.sub(r"\.\d+$", "", col)
+        cleaned = _DUP_SUFFIX.sub("", col)
         try:
             return datetime.fromisoformat(cleaned)
         except ValueError:
@@ -28,26 +58,36 @@ def _parse_session_column(col) -> datetime | None:
     return None
 
 
-def _extract_session_info(df: pd.DataFrame) -> dict[str, tuple[str, date]]:
-    """Build a mapping from column label to (session_name, session_date).
+def _extract_session_info(df: pd.DataFrame) -> dict[str, tuple[str, date, str]]:
+    """Build a mapping from column label to (session_name, session_date, day).
 
     Row 0 of the dataframe contains session names in session columns
     (and NaN in non-session columns). The column header itself is the
-    session datetime.
+    session datetime. The day of week is computed here, once per session,
+    rather than once per attendance row.
     """
-    session_info: dict[str, tuple[str, date]] = {}
-    for col in df.columns:
+    session_info: dict[str, tuple[str, date, str]] = {}
+    # Take row 0 once rather than building a Series per column to read it
+    first_row = df.iloc[0].to_numpy()
+    for col, raw_name in zip(df.columns, first_row):
         dt = _parse_session_column(col)
         if dt is not None:
-            session_name = str(df[col].iloc[0]).strip().rstrip("*").strip()
+            session_name = str(raw_name).strip().rstrip("*").strip()
             session_date = dt.date()
-            session_info[col] = (session_name, session_date)
+            session_info[col] = (
+                session_name,
+                session_date,
+                DAY_NAMES[session_date.weekday()],
+            )
     return session_info
 
 
-def transform_file(df: pd.DataFrame) -> pd.DataFrame:
+def transform_file(df: pd.DataFrame, *, include_future: bool = False) -> pd.DataFrame:
     """Transform a single attendance file from wide to long format.
 
+    Sessions dated today or later are dropped unless include_future is
+    set (the per-file cache keeps them, as they fall due on later runs).
+
     Returns DataFrame with columns:
         name, session_name, session_date, session_day_of_week, attended
     """
@@ -55,66 +95,163 @@ def transform_file(df: pd.DataFrame) -> pd.DataFrame:
     if not session_info:
         raise ValueError("No session columns found in file")
 
+    # Scheduled (future) sessions are dropped here with one date comparison
+    # per session, before they are expanded into a row per member
+    if not include_future:
+        today = date.today()
+        session_info = {
+            col: info for col, info in session_info.items() if info[1] < today
+        }
     session_columns = list(session_info.keys())
 
-    # Row 0 contains session names (not attendance data) — skip it
-    attendance = df.iloc[1:].copy()
-
-    # Drop disclaimer rows (Name starts with "*Attendance") and NaN names
-    attendance = attendance[
-        attendance["Name"].notna()
-        & ~attendance["Name"].astype(str).str.startswith("*Attendance")
-    ]
-
-    # Keep only Name + session columns
-    attendance = attendance[["Name"] + session_columns]
-
-    # Melt from wide to long
-    melted = attendance.melt(
-        id_vars=["Name"],
-        value_vars=session_columns,
-        var_name="_session_col",
-        value_name="attended",
+    # Row 0 contains session names (not attendance data) — skip it. Work on
+    # the raw arrays so no intermediate copy of the wide frame is made.
+    all_names = df["Name"].to_numpy()[1:]
+
+    # Drop disclaimer rows (Name starts with "*Attendance") and NaN names,
+    # in one pass over the raw values
+    is_member = np.array(
+        [
+            pd.notna(name) and not str(name).startswith("*Attendance")
+            for name in all_names
+        ],
+        dtype=bool,
     )
 
-    # Map session column back to session name and date
-    melted["session_name"] = melted["_session_col"].map(lambda c: session_info[c][0])
-    melted["session_date"] = melted["_session_col"].map(lambda c: session_info[c][1])
-    melted["session_day_of_week"] = melted["session_date"].apply(
-        lambda d: d.strftime("%A")
-    )
-
-    melted = melted.drop(columns=["_session_col"])
-    melted = melted.rename(columns={"Name": "name"})
-
-    # Convert attended: 1 -> 1, NaN/anything else -> 0
-    melted["attended"] = (
-        pd.to_numeric(melted["attended"], errors="coerce").fillna(0).astype(int)
+    # Wide to long without melt: one row per (session, member), sessions
+    # outermost as melt would order them. Each column is a take from that
+    # file's distinct values, so strings are converted to the column dtype
+    # (Arrow-backed on pandas 3) once per member or session, not per row.
+    # Nearly every column is a session, so converting the whole frame once
+    # and slicing by position beats selecting the columns first.
+    names = all_names[is_member]
+    session_positions = df.columns.get_indexer(session_columns)
+    values = df.to_numpy()[1:, session_positions][is_member]
+    n_members, n_sessions = values.shape
+    # Empty if every session in the export is still to come
+    session_names = [info[0] for info in session_info.values()]
+    session_dates = [info[1] for info in session_info.values()]
+    session_days = [info[2] for info in session_info.values()]
+    member_rows = np.tile(np.arange(n_members), n_sessions)
+    session_rows = np.repeat(np.arange(n_sessions), n_members)
+
+    # Convert attended: 1 -> 1, NaN/anything else -> 0. Depending on the
+    # Excel reader a tick is 1, 1.0 or "1"; equality tests cover all three.
+    # Held as int8, as the column is only ever 0 or 1.
+    flat = values.ravel(order="F")
+    attended = (flat == 1) | (flat == "1")
+
+    return pd.DataFrame(
+        {
+            "name": pd.Index(names).take(member_rows),
+            "session_name": pd.Index(session_names).take(session_rows),
+            "session_date": pd.Index(session_dates, dtype=object).take(session_rows),
+            "session_day_of_week": pd.Index(session_days).take(session_rows),
+            "attended": attended.astype(np.int8),
+        }
     )
 
-    return melted[
-        ["name", "session_name", "session_date", "session_day_of_week", "attended"]
-    ]
 
-
-def process_files(files: list[Path]) -> pd.DataFrame:
+def process_files(
+    files: list[Path], cache_dir: Path | None = None, *, refresh: bool = False
+) -> pd.DataFrame:
     """Process multiple attendance files with deduplication.
 
     Files must be sorted oldest-first. When a session appears in
     multiple files, the oldest version wins (members who leave the
     club disappear from newer exports).
-    """
-    from .io import read_attendance_file
-
-    all_frames = []
-    for file_rank, path in enumerate(files):
-        raw_df = read_attendance_file(path)
-        long_df = transform_file(raw_df)
-        long_df["_source_rank"] = file_rank
-        all_frames.append(long_df)
 
-    combined = pd.concat(all_frames, ignore_index=True)
-    return _deduplicate(combined)
+    With a cache_dir, each file's long-format frame is kept there as
+    parquet, so unchanged exports are not parsed again. An entry is reused
+    only for the exact export it was built from (same path, size and
+    modification time) and while it is newer than the reading and
+    transform code. With refresh, every export is parsed and its entry
+    rewritten.
+    """
+    from .io import read_many
+
+    long_frames: dict[Path, pd.DataFrame] = {}
+    stamps: dict[Path, bytes] = {}
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for path in files:
+            # Taken before any read, so an export changed mid-run is not
+            # cached under its new stamp
+            stamps[path] = _source_stamp(path)
+            cached = None if refresh else _read_cache(cache_dir, path, stamps[path])
+            if cached is not None:
+                long_frames[path] = cached
+
+    # Only exports without a fresh cache entry are read (in parallel). The
+    # cache keeps future sessions: they fall due on later runs, and
+    # _finalize drops them until then.
+    stale = [path for path in files if path not in long_frames]
+    for path, raw_df in zip(stale, read_many(stale)):
+        long_df = transform_file(raw_df, include_future=cache_dir is not None)
+        if cache_dir is not None:
+            _write_cache(long_df, _cache_path(cache_dir, path), stamps[path])
+        long_frames[path] = long_df
+
+    # Frames are stacked oldest-first, so the first row per key is the
+    # oldest file's version: no rank column or rank sort is needed. A
+    # single export (the usual incremental run) needs no concat copy; it is
+    # still deduplicated, as one export can hold two same-named sessions on
+    # the same day, which share a key.
+    frames = [long_frames[path] for path in files]
+    combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return _finalize(combined[~combined.duplicated(DEDUP_KEY)])
+
+
+def _cache_path(cache_dir: Path, path: Path) -> Path:
+    return cache_dir / f"{path.stem}.parquet"
+
+
+def _source_stamp(path: Path) -> bytes:
+    """Identify the export a cache entry is built from."""
+    stat = path.stat()
+    return json.dumps(
+        {
+            "path": str(path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    ).encode()
+
+
+def _read_cache(cache_dir: Path, path: Path, stamp: bytes) -> pd.DataFrame | None:
+    """Return path's cached frame, or None if the entry is missing, stale
+    or unreadable (e.g. left by an interrupted run)."""
+    import pyarrow.parquet as pq
+
+    cache_path = _cache_path(cache_dir, path)
+    code = (Path(__file__), Path(__file__).with_name("io.py"))
+    try:
+        cache_mtime = cache_path.stat().st_mtime
+        if any(p.stat().st_mtime > cache_mtime for p in code):
+            return None
+        # The footer alone says which export the entry was built from
+        metadata = pq.read_schema(cache_path).metadata or {}
+        if metadata.get(_CACHE_SOURCE_KEY) != stamp:
+            return None
+        return pd.read_parquet(cache_path)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(df: pd.DataFrame, cache_path: Path, stamp: bytes) -> None:
+    """Write a cache entry, stamped with its export, via a temporary sibling
+    so an interrupted run never leaves a partial file under the entry's
+    name."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), _CACHE_SOURCE_KEY: stamp}
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    pq.write_table(
+        table.replace_schema_metadata(metadata), tmp_path, compression="zstd"
+    )
+    os.replace(tmp_path, cache_path)
 
 
 def merge_with_existing(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
@@ -123,26 +260,37 @@ def merge_with_existing(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFra
     Existing (older) data takes priority because members who leave the
     club disappear from newer Spond exports.
     """
-    existing["_source_rank"] = 0
-    new["_source_rank"] = 1
+    # Stacking existing first makes the source order the rank, as in
+    # process_files: no per-row rank column is written to either input.
+    # Categoricals get shared categories first, or concat would fall back to
+    # per-row strings.
+    existing, new = _share_categories(existing, new)
     combined = pd.concat([existing, new], ignore_index=True)
-    return _deduplicate(combined)
+    return _finalize(combined.drop_duplicates(subset=DEDUP_KEY, ignore_index=True))
 
 
-def _deduplicate(df: pd.DataFrame) -> pd.DataFrame:
-    """Deduplicate rows: for each (name, session_name, session_date),
-    keep the row from the lowest _source_rank (oldest source wins)."""
-    today = date.today()
+def _share_categories(
+    a: pd.DataFrame, b: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Give categorical columns present as categoricals in both frames the
+    union of their categories (a remap of codes, not of values)."""
+    shared_a, shared_b = {}, {}
+    for col in CATEGORICAL_COLUMNS:
+        if a[col].dtype == "category" and b[col].dtype == "category":
+            categories = a[col].cat.categories.union(b[col].cat.categories)
+            shared_a[col] = a[col].cat.set_categories(categories)
+            shared_b[col] = b[col].cat.set_categories(categories)
+    return a.assign(**shared_a), b.assign(**shared_b)
 
-    df = df.sort_values("_source_rank")
-    df = df.drop_duplicates(
-        subset=["name", "session_name", "session_date"],
-        keep="first",
-    )
-    df = df.drop(columns=["_source_rank"])
 
-    # Filter out future sessions
-    df = df[df["session_date"] < today]
+def _finalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop future sessions, categorize strings and put rows in output order.
+
+    Categoricals are applied here rather than per file: concatenating
+    frames whose categories differ would fall back to plain strings.
+    """
+    df = df[df["session_date"] < date.today()]
+    df = df.astype(dict.fromkeys(CATEGORICAL_COLUMNS, "category"))
 
     return df.sort_values(["session_date", "session_name", "name"]).reset_index(
         drop=True
@@ -153,13 +301,25 @@ def generate_outputs(df: pd.DataFrame, output_dir: Path) -> tuple[Path, Path]:
     """Write the two output CSVs."""
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Detailed attendance
+    # Detailed attendance. Date objects are formatted once per distinct
+    # session date instead of once per row; a trailing "" covers missing
+    # values (factorize code -1), matching to_csv's empty cell.
     detail_path = output_dir / "spond.csv"
-    df.to_csv(detail_path, sep="|", index=False)
-
-    # Session summary
+    detail = df
+    if df["session_date"].dtype == object:
+        codes, dates = pd.factorize(df["session_date"])
+        labels = np.array([*map(str, dates), ""], dtype=object)
+        detail = df.assign(session_date=labels[codes])
+    detail.to_csv(detail_path, sep="|", index=False)
+
+    # Session summary. observed=True groups only the sessions present rather
+    # than every combination of categories; the explicit sort orders output.
     session_attendance = (
-        df.groupby(["session_name", "session_date", "session_day_of_week"])["attended"]
+        df.groupby(
+            ["session_name", "session_date", "session_day_of_week"],
+            observed=True,
+            sort=False,
+        )["attended"]
         .sum()
         .reset_index()
         .sort_values(["session_date", "session_name"])
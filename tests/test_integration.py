@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import os
 import shutil
+import warnings
 from datetime import date
 from pathlib import Path
 
@@ -59,6 +61,19 @@ def three_files(tmp_path: Path) -> Path:
     return tmp_path
 
 
+def _record_reads(monkeypatch) -> list[list[Path]]:
+    """Patch io.read_many to record the paths of each call."""
+    reads: list[list[Path]] = []
+    read_many = io.read_many
+
+    def recording(to_read):
+        reads.append(list(to_read))
+        return read_many(to_read)
+
+    monkeypatch.setattr(io, "read_many", recording)
+    return reads
+
+
 # ---------------------------------------------------------------------------
 # test_single_file_processing
 # ---------------------------------------------------------------------------
@@ -140,15 +155,15 @@ class TestAttendanceFigures:
         assert self.result["name"].nunique() == 113
 
     def test_unique_sessions(self):
-        sessions = self.result.groupby(["session_name", "session_date"]).ngroups
-        assert sessions == 298
+        sessions = self.result.drop_duplicates(subset=["session_name", "session_date"])
+        assert len(sessions) == 298
 
     def test_total_attended(self):
         assert self.result["attended"].sum() == 2543
 
     def test_every_member_has_all_sessions(self):
         """Each member should have exactly one row per session."""
-        per_member = self.result.groupby("name").size()
+        per_member = self.result["name"].value_counts()
         assert (per_member == 298).all()
 
     def test_stv_swim_apr_12_attendance_count(self):
@@ -323,8 +338,6 @@ class TestDedupOlderWins:
         for p in paths:
             raw = io.read_attendance_file(p)
             long = transform.transform_file(raw)
-            # Filter to past dates (matching _deduplicate behaviour).
-            long = long[long["session_date"] < date.today()]
             individual_total += len(long)
 
         # Process them together (with deduplication).
@@ -336,3 +349,132 @@ class TestDedupOlderWins:
         )
         # The combined result should still have a reasonable number of rows.
         assert len(combined) > 0
+
+
+# ---------------------------------------------------------------------------
+# test_read_many
+# ---------------------------------------------------------------------------
+
+
+@data_dir_exists
+class TestReadMany:
+    """Verify parallel reads match serial reads, in input order."""
+
+    def test_matches_serial_reads_in_order(self, three_files: Path, monkeypatch):
+        # Take the pool path whatever the engine and core count
+        monkeypatch.setattr(io, "CALAMINE_POOL_MIN_FILES", 0)
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+        paths = io.discover_files(three_files)
+        frames = io.read_many(paths)
+        assert len(frames) == len(paths)
+        for path, frame in zip(paths, frames):
+            pd.testing.assert_frame_equal(frame, io.read_attendance_file(path))
+
+
+@data_dir_exists
+class TestOpenpyxlReader:
+    """Verify the read-only openpyxl reader matches read_excel."""
+
+    def test_matches_read_excel(self, single_file: Path):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fast = io._read_openpyxl(single_file)
+            reference = pd.read_excel(single_file, engine="openpyxl")
+        assert list(fast.columns) == list(reference.columns)
+        assert fast.shape == reference.shape
+        pd.testing.assert_frame_equal(
+            transform.transform_file(fast), transform.transform_file(reference)
+        )
+
+
+# ---------------------------------------------------------------------------
+# test_process_files_cache
+# ---------------------------------------------------------------------------
+
+
+@data_dir_exists
+class TestProcessFilesCache:
+    """Verify the per-file parquet cache is written, reused and refreshed."""
+
+    def test_warm_run_matches_cold_without_reading(
+        self, two_files: Path, tmp_path: Path, monkeypatch
+    ):
+        paths = io.discover_files(two_files)
+        cache_dir = tmp_path / "cache"
+        cold = transform.process_files(paths, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(cold, transform.process_files(paths))
+        assert sorted(p.name for p in cache_dir.iterdir()) == sorted(
+            f"{p.stem}.parquet" for p in paths
+        )
+
+        def read_none(to_read):
+            assert not to_read, "cached exports should not be read"
+            return []
+
+        monkeypatch.setattr(io, "read_many", read_none)
+        warm = transform.process_files(paths, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(warm, cold)
+
+    def test_newer_export_is_reread(self, two_files: Path, tmp_path: Path):
+        paths = io.discover_files(two_files)
+        cache_dir = tmp_path / "cache"
+        transform.process_files(paths, cache_dir=cache_dir)
+        cache_path = cache_dir / f"{paths[0].stem}.parquet"
+        stale_mtime = cache_path.stat().st_mtime - 10
+        os.utime(cache_path, (stale_mtime, stale_mtime))
+        os.utime(paths[0])
+
+        transform.process_files(paths, cache_dir=cache_dir)
+        assert cache_path.stat().st_mtime > stale_mtime
+
+    def test_export_replaced_by_older_file_is_reread(
+        self, two_files: Path, tmp_path: Path, monkeypatch
+    ):
+        paths = io.discover_files(two_files)
+        cache_dir = tmp_path / "cache"
+        transform.process_files(paths, cache_dir=cache_dir)
+        # As cp -p or a restored backup would: other content, an older mtime
+        shutil.copy(DATA_DIR / "spond_attendance_may_25.xlsx", paths[0])
+        os.utime(paths[0], (0, 0))
+
+        reads = _record_reads(monkeypatch)
+        transform.process_files(paths, cache_dir=cache_dir)
+        assert reads == [[paths[0]]]
+
+    def test_same_name_in_another_directory_is_reread(
+        self, two_files: Path, tmp_path: Path, monkeypatch
+    ):
+        paths = io.discover_files(two_files)
+        cache_dir = tmp_path / "cache"
+        transform.process_files(paths, cache_dir=cache_dir)
+        other_dir = tmp_path / "other"
+        other_dir.mkdir()
+        other = other_dir / paths[0].name
+        shutil.copy2(paths[0], other)
+
+        reads = _record_reads(monkeypatch)
+        transform.process_files([other], cache_dir=cache_dir)
+        assert reads == [[other]]
+
+    def test_refresh_rereads_and_rewrites(
+        self, two_files: Path, tmp_path: Path, monkeypatch
+    ):
+        paths = io.discover_files(two_files)
+        cache_dir = tmp_path / "cache"
+        cold = transform.process_files(paths, cache_dir=cache_dir)
+
+        reads = _record_reads(monkeypatch)
+        refreshed = transform.process_files(paths, cache_dir=cache_dir, refresh=True)
+        assert reads == [paths]
+        pd.testing.assert_frame_equal(refreshed, cold)
+
+    def test_unreadable_entry_is_reparsed(self, two_files: Path, tmp_path: Path):
+        paths = io.discover_files(two_files)
+        cache_dir = tmp_path / "cache"
+        cold = transform.process_files(paths, cache_dir=cache_dir)
+        cache_path = cache_dir / f"{paths[0].stem}.parquet"
+        cache_path.write_bytes(cache_path.read_bytes()[:100])
+
+        warm = transform.process_files(paths, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(warm, cold)
+        pd.read_parquet(cache_path)
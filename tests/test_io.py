@@ -1,11 +1,12 @@
 """Tests for spond_attendance.io module."""
 
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
 
 import pytest
 
 from spond_attendance.io import (
+    _header_names,
     discover_files,
     find_new_files,
     load_state,
@@ -123,3 +124,30 @@ class TestFindNewFiles:
         ]
         result = find_new_files(files, set())
         assert result == files
+
+
+# ---------------------------------------------------------------------------
+# _header_names
+# ---------------------------------------------------------------------------
+
+
+class TestHeaderNames:
+    def test_blank_headers_named_by_position(self):
+        assert list(_header_names(("Name", None, "Total", None))) == [
+            "Name",
+            "Unnamed: 1",
+            "Total",
+            "Unnamed: 3",
+        ]
+
+    def test_repeated_datetime_headers_get_suffixes(self):
+        dt = datetime(2025, 4, 9, 18, 45)
+        assert list(_header_names(("Name", dt, dt, dt))) == [
+            "Name",
+            dt,
+            "2025-04-09 18:45:00.1",
+            "2025-04-09 18:45:00.2",
+        ]
+
+    def test_suffix_skips_names_already_taken(self):
+        assert list(_header_names(("a", "a.1", "a"))) == ["a", "a.1", "a.2"]
@@ -164,12 +164,30 @@ class TestApplyNameMappings:
         apply_name_mappings(df, {"STV Swim!": "STV Swim"})
         assert df["session_name"].iloc[0] == "STV Swim!"
 
+    def test_no_matching_names_returns_same_frame(self):
+        df = pd.DataFrame({"session_name": ["A", "B"]})
+        assert apply_name_mappings(df, {"Other": "Mapped"}) is df
+
     def test_skip_sentinel_ignored(self):
         df = pd.DataFrame({"session_name": ["Skipped Name", "STV Swim!"]})
         mappings = {"Skipped Name": SKIP_SENTINEL, "STV Swim!": "STV Swim"}
         result = apply_name_mappings(df, mappings)
         assert list(result["session_name"]) == ["Skipped Name", "STV Swim"]
 
+    def test_categorical_names_stay_categorical(self):
+        df = pd.DataFrame(
+            {"session_name": pd.Categorical(["STV Swim!", "STV Swim", "Run"])}
+        )
+        result = apply_name_mappings(df, {"STV Swim!": "STV Swim"})
+        assert result["session_name"].dtype == "category"
+        assert list(result["session_name"]) == ["STV Swim", "STV Swim", "Run"]
+
+    def test_categorical_missing_names_stay_missing(self):
+        df = pd.DataFrame({"session_name": pd.Categorical(["STV Swim!", None])})
+        result = apply_name_mappings(df, {"STV Swim!": "STV Swim"})
+        assert result["session_name"].iloc[0] == "STV Swim"
+        assert pd.isna(result["session_name"].iloc[1])
+
 
 # ---------------------------------------------------------------------------
 # suggest_mappings (mocked CLI)
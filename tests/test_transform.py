@@ -10,7 +10,6 @@ import pandas as pd
 import pytest
 
 from spond_attendance.transform import (
-    _deduplicate,
     _extract_session_info,
     _parse_session_column,
     generate_outputs,
@@ -23,9 +22,9 @@ from spond_attendance.transform import (
 # Helpers
 # ---------------------------------------------------------------------------
 
-# Use dates well in the past to avoid future-session filtering in _deduplicate.
-# Column headers are strings (as _parse_session_column handles) — this avoids
-# a pandas 3.0 issue where melt() does not support raw datetime column keys.
+# Use dates well in the past to avoid future-session filtering.
+# Column headers are datetime strings, one of the header forms
+# _parse_session_column accepts.
 SESSION_COL_A = "2024-03-09 14:00:00"
 SESSION_COL_B = "2024-03-09 08:00:00"
 SESSION_DATE = date(2024, 3, 9)
@@ -55,34 +54,21 @@ def _make_wide_df(
       - Row 0 contains session names (and NaN for non-session columns).
       - Rows 1..N contain member attendance data.
     """
-    col_order = ["Name", "Unnamed: 6"] + list(sessions.keys())
-
-    # Row 0: session-name row
-    row0: dict = {"Name": np.nan, "Unnamed: 6": np.nan}
-    for col, (sname, _vals) in sessions.items():
-        row0[col] = sname
-
-    # Data rows
-    data_rows = []
-    for i, name in enumerate(members):
-        row: dict = {"Name": name, "Unnamed: 6": np.nan}
-        for col, (_sname, vals) in sessions.items():
-            row[col] = vals[i]
-        data_rows.append(row)
-
-    rows = [row0] + data_rows
+    # Column-major: row 0 holds session names (NaN for non-session columns),
+    # then one row per member
+    columns: dict = {
+        "Name": [np.nan, *members],
+        "Unnamed: 6": [np.nan] * (len(members) + 1),
+    }
+    for col, (sname, vals) in sessions.items():
+        columns[col] = [sname, *vals]
 
     if include_disclaimer:
-        disclaimer_row: dict = {
-            "Name": "*Attendance has not been confirmed",
-            "Unnamed: 6": np.nan,
-        }
-        for col in sessions:
-            disclaimer_row[col] = np.nan
-        rows.append(disclaimer_row)
+        columns["Name"].append("*Attendance has not been confirmed")
+        for col in list(columns)[1:]:
+            columns[col].append(np.nan)
 
-    df = pd.DataFrame(rows, columns=col_order)  # ty: ignore[invalid-argument-type]
-    return df
+    return pd.DataFrame(columns)
 
 
 # ---------------------------------------------------------------------------
@@ -141,8 +127,8 @@ class TestExtractSessionInfo:
         assert len(info) == 2
 
         # Stars stripped from session names
-        assert info[dt_a] == ("Session A", date(2025, 4, 12))  # ty: ignore[invalid-argument-type]
-        assert info[dt_b] == ("Session B", date(2025, 4, 12))  # ty: ignore[invalid-argument-type]
+        assert info[dt_a] == ("Session A", date(2025, 4, 12), "Saturday")  # ty: ignore[invalid-argument-type]
+        assert info[dt_b] == ("Session B", date(2025, 4, 12), "Saturday")  # ty: ignore[invalid-argument-type]
 
     def test_non_datetime_columns_ignored(self):
         dt = datetime(2025, 4, 12, 14, 0)
@@ -196,7 +182,7 @@ class TestTransformFile:
 
         attended_values = sorted(result["attended"].tolist())
         assert attended_values == [0, 1]
-        assert result["attended"].dtype == int
+        assert pd.api.types.is_integer_dtype(result["attended"])
 
     def test_disclaimer_row_filtered_out(self):
         members = ["Alice", "Bob"]
@@ -234,6 +220,18 @@ class TestTransformFile:
 
         assert result["session_day_of_week"].iloc[0] == "Saturday"
 
+    def test_future_sessions_dropped(self):
+        members = ["Alice", "Bob"]
+        sessions = {
+            SESSION_COL_A: ("Session A*", [1, 1]),
+            "2099-12-31 10:00:00": ("Upcoming*", [np.nan, np.nan]),
+        }
+        df = _make_wide_df(members, sessions)
+        result = transform_file(df)
+
+        assert list(result["session_name"].unique()) == ["Session A"]
+        assert result.shape[0] == 2
+
     def test_raises_when_no_session_columns(self):
         df = pd.DataFrame({"Name": ["Alice", "Bob"], "SomeCol": [1, 2]})
         with pytest.raises(ValueError, match="No session columns found"):
@@ -241,7 +239,7 @@ class TestTransformFile:
 
 
 # ---------------------------------------------------------------------------
-# merge_with_existing / _deduplicate
+# merge_with_existing
 # ---------------------------------------------------------------------------
 
 
@@ -303,55 +301,45 @@ class TestMergeWithExisting:
         assert result.iloc[0]["name"] == "Alice"
         assert result.iloc[0]["session_date"] == date(2024, 1, 10)
 
+    def test_inputs_not_modified(self):
+        existing = pd.DataFrame(
+            [self._make_long_row("Alice", "Training", date(2024, 1, 10), 1)]
+        )
+        new = pd.DataFrame(
+            [self._make_long_row("Bob", "Training", date(2024, 1, 10), 1)]
+        )
+        merge_with_existing(existing, new)
 
-class TestDeduplicate:
-    def test_keeps_lowest_source_rank(self):
-        df = pd.DataFrame(
+        assert "_source_rank" not in existing.columns
+        assert "_source_rank" not in new.columns
+
+    def test_categorical_inputs_with_different_categories(self):
+        categorical = dict.fromkeys(
+            ["name", "session_name", "session_day_of_week"], "category"
+        )
+        existing = pd.DataFrame(
+            [self._make_long_row("Alice", "Training", date(2024, 1, 10), 1)]
+        ).astype(categorical)
+        new = pd.DataFrame(
             [
-                {
-                    "name": "Alice",
-                    "session_name": "Training",
-                    "session_date": date(2024, 1, 10),
-                    "session_day_of_week": "Wednesday",
-                    "attended": 1,
-                    "_source_rank": 0,
-                },
-                {
-                    "name": "Alice",
-                    "session_name": "Training",
-                    "session_date": date(2024, 1, 10),
-                    "session_day_of_week": "Wednesday",
-                    "attended": 0,
-                    "_source_rank": 1,
-                },
+                self._make_long_row("Alice", "Training", date(2024, 1, 10), 0),
+                self._make_long_row("Bob", "Swim", date(2024, 1, 10), 1),
             ]
-        )
-        result = _deduplicate(df)
-        assert len(result) == 1
-        assert result.iloc[0]["attended"] == 1
+        ).astype(categorical)
+        result = merge_with_existing(existing, new)
+
+        assert result["session_name"].dtype == "category"
+        assert list(result["name"]) == ["Bob", "Alice"]
+        assert list(result["attended"]) == [1, 1]
 
     def test_result_sorted_by_date_session_name(self):
-        df = pd.DataFrame(
-            [
-                {
-                    "name": "Bob",
-                    "session_name": "Training",
-                    "session_date": date(2024, 2, 1),
-                    "session_day_of_week": "Thursday",
-                    "attended": 1,
-                    "_source_rank": 0,
-                },
-                {
-                    "name": "Alice",
-                    "session_name": "Training",
-                    "session_date": date(2024, 1, 10),
-                    "session_day_of_week": "Wednesday",
-                    "attended": 1,
-                    "_source_rank": 0,
-                },
-            ]
+        existing = pd.DataFrame(
+            [self._make_long_row("Bob", "Training", date(2024, 2, 1), 1)]
         )
-        result = _deduplicate(df)
+        new = pd.DataFrame(
+            [self._make_long_row("Alice", "Training", date(2024, 1, 10), 1)]
+        )
+        result = merge_with_existing(existing, new)
         assert list(result["name"]) == ["Alice", "Bob"]
 
 
@@ -467,6 +455,35 @@ class TestGenerateOutputs:
         match_row = summary[summary["session_name"] == "Match"].iloc[0]
         assert match_row["attended"] == 1  # Alice only
 
+    def test_session_attendance_keyed_on_name_and_date(self, tmp_path: Path):
+        rows = [
+            ("Training", date(2024, 1, 12), "Friday", 1),
+            ("Match", date(2024, 1, 10), "Wednesday", 1),
+            ("Training", date(2024, 1, 10), "Wednesday", 0),
+            ("Training", date(2024, 1, 12), "Friday", 1),
+            ("Match", date(2024, 1, 10), "Wednesday", 1),
+        ]
+        df = pd.DataFrame(
+            [
+                {
+                    "name": f"Member {i}",
+                    "session_name": session_name,
+                    "session_date": session_date,
+                    "session_day_of_week": day,
+                    "attended": attended,
+                }
+                for i, (session_name, session_date, day, attended) in enumerate(rows)
+            ]
+        )
+        _detail_path, summary_path = generate_outputs(df, tmp_path / "out")
+
+        summary = pd.read_csv(summary_path, sep="|")
+        assert summary.values.tolist() == [
+            ["Match", "2024-01-10", "Wednesday", 2],
+            ["Training", "2024-01-10", "Wednesday", 0],
+            ["Training", "2024-01-12", "Friday", 2],
+        ]
+
     def test_creates_output_directory(self, tmp_path: Path):
         df = pd.DataFrame(
             [